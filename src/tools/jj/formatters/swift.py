@@ -9,10 +9,30 @@ import shutil
 import sys
 
 _FORMATTER = "third_party/depot_tools/swift-format"
+_CHUNK_SIZE = 1 << 20
+
+
+def _copy_stdin_to_stdout():
+  """Copies stdin to stdout as bytes, in the kernel where possible."""
+  sys.stdout.flush()
+  src = sys.stdin.buffer.fileno()
+  dst = sys.stdout.buffer.fileno()
+  try:
+    while os.sendfile(dst, src, None, _CHUNK_SIZE):
+      pass
+  except OSError:
+    # sendfile doesn't support every kind of file (eg. pipes as the source on
+    # older kernels). Anything it already copied has been consumed, so the
+    # fallback carries on from where it stopped.
+    shutil.copyfileobj(sys.stdin.buffer, sys.stdout.buffer, _CHUNK_SIZE)
+
 
 # Swift formatter is only supported on macOS, so make it a no-op on other
-# platforms.
+# platforms. Prefer handing the copy over to cat entirely.
 if sys.platform != "darwin":
-  shutil.copyfileobj(sys.stdin, sys.stdout)
+  try:
+    os.execvp("cat", ["cat"])
+  except OSError:
+    _copy_stdin_to_stdout()
 else:
   os.execv(_FORMATTER, [_FORMATTER] + sys.argv[1:])
@@ -4,6 +4,7 @@
 
 import logging
 import subprocess
+from typing import Iterator
 
 # CSV-file like separators. The templating language doesn't support escaping,
 # so we use
@@ -12,10 +13,15 @@ _NEWLINE = '\x1e'
 _COMMA = '\x1f'
 
 
+def _log_command(args: list[str]) -> None:
+  if logging.getLogger().isEnabledFor(logging.DEBUG):
+    logging.debug('Running command %s', ' '.join(map(str, args)))
+
+
 def run_command(args: list[str],
                 check=True,
                 **kwargs) -> subprocess.CompletedProcess:
-  logging.debug('Running command %s', ' '.join(map(str, args)))
+  _log_command(args)
   ps = subprocess.run(args, **kwargs, check=False)
   if check and ps.returncode:
     # Don't create a stack trace.
@@ -23,8 +29,8 @@ def run_command(args: list[str],
   return ps
 
 
-def _log(args: list[str], templates: dict[str, str],
-         ignore_working_copy: bool) -> list[dict[str, str]]:
+def _iter_log(args: list[str], templates: dict[str, str],
+              ignore_working_copy: bool) -> Iterator[dict[str, str]]:
   """Log acts akin to a database query on a table.
 
   The user will provide templates such as {
@@ -34,10 +40,13 @@ def _log(args: list[str], templates: dict[str, str],
 
   And a set of revisions to lookup (eg. 'a|b').
 
-  And it would then return [
+  And it would then yield
      {'change_id': 'a', 'parents': '<parent of a's id>'}
      {'change_id': 'b', 'parents': '<parent of b's id>'}
-  ]
+
+  Rows are yielded as soon as jj outputs them, rather than once it finishes.
+  If jj outputs nothing (eg. no revisions match), nothing is yielded; this
+  used to produce a single row with an empty first field.
   """
   # Start by assigning indexes based on the field name.
   fields, templates = zip(*sorted(templates.items()))
@@ -47,17 +56,27 @@ def _log(args: list[str], templates: dict[str, str],
   if ignore_working_copy:
     args.append('--ignore-working-copy')
 
-  stdout = run_command(
-      ['jj', *args, '--no-pager', '--no-graph', '-T', template],
-      stdout=subprocess.PIPE,
-      text=True,
-  ).stdout
+  command = ['jj', *args, '--no-pager', '--no-graph', '-T', template]
+  _log_command(command)
 
-  # Now we parse our CSV file.
-  return [{
-      field: value
-      for field, value in zip(fields, change.split(_COMMA))
-  } for change in stdout.rstrip(_NEWLINE).split(_NEWLINE)]
+  # Now we parse our CSV file as it arrives. We know how many fields there are,
+  # so there's no need to scan beyond the last separator. The separators are
+  # ASCII, so splitting the raw bytes never splits a UTF-8 sequence.
+  maxsplit = len(fields) - 1
+  newline = _NEWLINE.encode()
+  with subprocess.Popen(command, stdout=subprocess.PIPE,
+                        bufsize=1 << 16) as ps:
+    pending = b''
+    while chunk := ps.stdout.read1():
+      *changes, pending = (pending + chunk).split(newline)
+      for change in changes:
+        yield dict(zip(fields, change.decode('utf-8').split(_COMMA, maxsplit)))
+    if pending:
+      yield dict(zip(fields, pending.decode('utf-8').split(_COMMA, maxsplit)))
+
+  if ps.returncode:
+    # Don't create a stack trace.
+    exit(ps.returncode)
 
 
 def jj_log(*,
@@ -66,7 +85,8 @@ def jj_log(*,
            ignore_working_copy=False) -> list[dict[str, str]]:
   """Retrieves information about jj revisions.
 
-  See _log for details."""
-  return _log(['log', '-r', revisions],
-              templates,
-              ignore_working_copy=ignore_working_copy)
+  Returns an empty list if no revisions match. See _iter_log for details."""
+  return list(
+      _iter_log(['log', '-r', revisions],
+                templates,
+                ignore_working_copy=ignore_working_copy))
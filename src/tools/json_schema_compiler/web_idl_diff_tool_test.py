@@ -23,14 +23,15 @@ class WebIdlDiffToolTest(unittest.TestCase):
     for old_schema_name, new_schema_name in converted_schemas:
       old_filename = converted_schema_path + old_schema_name
       new_filename = converted_schema_path + new_schema_name
-      diff = web_idl_diff_tool.LoadAndReturnUnifiedDiff(old_filename,
-                                                        new_filename)
-      self.assertEqual(
-          '',
-          diff,
-          f"Difference detected between '{old_filename}' and"
-          f" '{new_filename}':\n{diff}",
-      )
+      with self.subTest(old=old_filename, new=new_filename):
+        diff = web_idl_diff_tool.LoadAndReturnUnifiedDiff(
+            old_filename, new_filename)
+        self.assertEqual(
+            '',
+            diff,
+            f"Difference detected between '{old_filename}' and"
+            f" '{new_filename}':\n{diff}",
+        )
 
 
 if __name__ == '__main__':
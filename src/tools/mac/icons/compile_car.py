@@ -17,9 +17,23 @@ instead.
 Full documentation can be found at //docs/mac/icons.md but briefly:
 
 $ python3 compile_car.py chrome/app/theme/chromium/mac/Assets.xcasset
+
+Drivers that invoke this script repeatedly can determine the `actool` version
+and the minimum deployment target once and pass them in with
+`--actool-version-verified` and `--min-deployment-target`, which skips the
+`xcrun actool --version` probe and the read of mac_sdk.gni on each invocation.
+The version passed must be the `bundle-version` (the build number) reported by
+`xcrun actool --version`, not the `short-bundle-version` such as 26.0, as it
+keys the cache of compiled outputs and must distinguish between builds.
 """
 
 import argparse
+import concurrent.futures
+import contextlib
+import functools
+import hashlib
+import io
+import json
 import os
 import pathlib
 import platform
@@ -46,19 +60,62 @@ def _unsplit_version(version: tuple[int, ...]) -> str:
 
 _REQUIRED_ACTOOL_VERSION = _split_version('26.0')
 
+_CACHE_DIR = pathlib.Path.home().joinpath('Library', 'Caches',
+                                          'chromium-compile_car')
+_ACTOOL_VERSION_CACHE = _CACHE_DIR.joinpath('actool_version.json')
+
+# The flags passed to every `actool` invocation, other than those that depend on
+# the inputs or on where the outputs go. These are part of the output cache key,
+# so changing them invalidates previously cached outputs.
+_ACTOOL_FLAGS = [
+    # Output and error handling.
+    '--output-format=xml1',
+    '--notices',
+    '--warnings',
+    '--errors',
+
+    # Platform.
+    '--platform=macosx',
+    '--target-device=mac',
+
+    # Correctness. This command-line argument is undocumented. It forces
+    # `actool` aka `ibtool` to use bundled versions of the asset catalog
+    # frameworks so that it generates consistent results no matter what
+    # OS release it is run on. Xcode 26+ includes this when invoking
+    # `actool`; see various copies of the `AssetCatalogCompiler.xcspec`
+    # file found in various places inside the Xcode package.
+    '--lightweight-asset-runtime-mode=enabled',
+
+    # Correctness. This command-line argument is undocumented. By
+    # default, if an `.icon` file is provided to `actool`, then `actool`
+    # will ignore any corresponding fallback bitmaps in the provided
+    # `.xcassets` directory, and generate its own. However, `actool`
+    # only generates 1x fallback bitmaps, which causes blurry icons to
+    # appear on 2x screens on macOS releases prior to macOS 26, which is
+    # undesirable (FB19028379). Given that there already are hand-
+    # crafted icon bitmaps available in the `.xcassets` directory, stop
+    # `actool` from generating its own, and have it use the available
+    # ones instead.
+    '--enable-icon-stack-fallback-generation=disabled',
+
+    # Target information.
+    '--app-icon=AppIcon',
+]
+
+_MAC_DEPLOYMENT_RE = re.compile(
+    r'^\s*mac_deployment_target\s*=\s*"(.*)"(?:\s*#.*)?$')
+
+
+def _check_actool_version(short_version: str) -> None:
+    """Verifies that an `actool` version is suitably recent.
 
-def _verify_actool_version() -> None:
-    """Verifies that the `actool` being used is suitably recent.
+    Args:
+        short_version: The short bundle version of `actool`, e.g. '26.0'.
 
     Raises:
         AssetCatalogException: If `actool` is too old
     """
-    command = ['xcrun', 'actool', '--output-format=xml1', '--version']
-    process = subprocess.check_output(command)
-    output_dict = plistlib.loads(process)
-
-    version = _split_version(
-        output_dict['com.apple.actool.version']['short-bundle-version'])
+    version = _split_version(short_version)
 
     if version < _REQUIRED_ACTOOL_VERSION:
         raise AssetCatalogException(
@@ -68,6 +125,79 @@ def _verify_actool_version() -> None:
             'required')
 
 
+def _actool_versions() -> tuple[str, str]:
+    """Asks `actool` for its version.
+
+    Returns:
+        A tuple of the short bundle version and the full bundle version of
+        `actool`.
+    """
+    command = ['xcrun', 'actool', '--output-format=xml1', '--version']
+    process = subprocess.check_output(command)
+    output_dict = plistlib.loads(process)
+    version_dict = output_dict['com.apple.actool.version']
+    return version_dict['short-bundle-version'], version_dict['bundle-version']
+
+
+@functools.cache
+def _verify_actool_version_cached() -> str:
+    """Verifies that the `actool` being used is suitably recent, reusing the
+    version found by a previous run if neither `xcrun` nor `actool` have
+    changed since.
+
+    Returns:
+        The full version of `actool`, as a string value.
+
+    Raises:
+        AssetCatalogException: If `actool` is too old
+    """
+    actool_path = subprocess.check_output(['xcrun', '-f', 'actool'],
+                                          text=True).strip()
+    key_parts = []
+    for binary in (shutil.which('xcrun'), actool_path):
+        stat = os.stat(binary)
+        key_parts.append(f'{binary}:{stat.st_mtime_ns}:{stat.st_size}')
+    key = '|'.join(key_parts)
+
+    try:
+        cached = json.loads(_ACTOOL_VERSION_CACHE.read_text())
+        if cached.get('key') == key:
+            short_version = cached['short_version']
+            version = cached['version']
+        else:
+            cached = None
+    except (OSError, ValueError, KeyError, AttributeError):
+        cached = None
+
+    if cached is None:
+        short_version, version = _actool_versions()
+        # The cache is an optimization, so failing to write it isn't fatal.
+        try:
+            _ACTOOL_VERSION_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            # The temporary file has a unique name so that concurrent runs
+            # can't clobber each other's partially written files.
+            with tempfile.NamedTemporaryFile(
+                    'w',
+                    dir=_ACTOOL_VERSION_CACHE.parent,
+                    prefix=f'{_ACTOOL_VERSION_CACHE.name}.',
+                    delete=False) as tmp_cache:
+                json.dump(
+                    {
+                        'key': key,
+                        'short_version': short_version,
+                        'version': version
+                    }, tmp_cache)
+            os.replace(tmp_cache.name, _ACTOOL_VERSION_CACHE)
+        except OSError:
+            pass
+
+    # Always check the version, even when it came from the cache, as the
+    # required version may have changed since it was cached.
+    _check_actool_version(short_version)
+    return version
+
+
+@functools.cache
 def _min_deployment_target() -> str:
     """Determines and returns the minimum deployment target, as determined by
     the `mac_deployment_target` value in the //build/config/mac/mac_sdk.gni
@@ -75,18 +205,169 @@ def _min_deployment_target() -> str:
 
     Returns:
         The minimum deployment target, as a string value.
+
+    Raises:
+        AssetCatalogException: If the deployment target could not be found
     """
     src_root = pathlib.Path(__file__).parent.joinpath(*((os.pardir,) * 3))
     mac_sdk_path = src_root.joinpath('build', 'config', 'mac', 'mac_sdk.gni')
 
     with open(mac_sdk_path, 'r') as mac_sdk_file:
-        match, = re.finditer(
-            r'^\s*mac_deployment_target\s*=\s*"(.*)"(?:\s*#.*)?$',
-            mac_sdk_file.read(), re.MULTILINE)
-        return match.group(1)
+        for line in mac_sdk_file:
+            match = _MAC_DEPLOYMENT_RE.match(line)
+            if match:
+                return match.group(1)
+
+    raise AssetCatalogException(
+        f'could not find mac_deployment_target in {mac_sdk_path}')
+
+
+def _hash_directory(hasher: 'hashlib._Hash', root: pathlib.Path) -> None:
+    """Feeds the relative path, size, and contents hash of every file inside
+    `root` into `hasher`, in a stable order.
+    """
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        for entry in entries:
+            if entry.is_dir():
+                pending.append(pathlib.Path(entry.path))
+                continue
+            file_hasher = hashlib.sha256()
+            with open(entry.path, 'rb') as file:
+                while chunk := file.read(1 << 20):
+                    file_hasher.update(chunk)
+            relpath = os.path.relpath(entry.path, root)
+            size = entry.stat().st_size
+            hasher.update(
+                f'{relpath}\0{size}\0{file_hasher.hexdigest()}\0'.encode())
+
+
+def _cache_key(path: pathlib.Path, appicon_path: pathlib.Path,
+               min_deployment_target: str, actool_version: str) -> str:
+    """Computes a key identifying the outputs of compiling an asset catalog.
+
+    Args:
+        path: A pathlib.Path object to the .xcassets directory.
+        appicon_path: A pathlib.Path object to the .icon package.
+        min_deployment_target: The minimum macOS deployment target string.
+        actool_version: The version of `actool` doing the compilation.
+
+    Returns:
+        A hex digest of all of the inputs.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(f'{min_deployment_target}\0{actool_version}\0'.encode())
+    hasher.update(''.join(f'{flag}\0' for flag in _ACTOOL_FLAGS).encode())
+    for root in (path, appicon_path):
+        hasher.update(f'{root.name}\0'.encode())
+        _hash_directory(hasher, root)
+    return hasher.hexdigest()
+
+
+def _store_in_cache(source: pathlib.Path, destination: pathlib.Path) -> None:
+    """Atomically places a copy of `source` at `destination`."""
+    # The temporary file has a unique name so that concurrent writers of the
+    # same cache entry can't clobber each other's partially written copies.
+    fd, tmp_destination = tempfile.mkstemp(dir=destination.parent,
+                                           prefix=f'{destination.name}.')
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp_destination)
+        os.replace(tmp_destination, destination)
+    except BaseException:
+        os.unlink(tmp_destination)
+        raise
+
+
+def _copy_output(source: pathlib.Path, destination: pathlib.Path,
+                 verbose: bool) -> None:
+    if verbose:
+        print(f'  Copying output to: {destination}')
+    shutil.copyfile(source, destination)
+
+
+def _prepare_inputs(path: pathlib.Path) -> tuple[str, pathlib.Path]:
+    """Validates the path of an asset catalog and derives its other inputs.
+
+    Args:
+        path: A pathlib.Path object to the .xcassets directory.
+
+    Returns:
+        A tuple of the channel tag of the asset catalog (e.g. '_beta', or ''
+        for none) and the pathlib.Path of the corresponding `.icon` package.
+
+    Raises:
+        ValueError: If the asset catalog's path is incorrect in format.
+    """
+    # The "tag" is the '_beta' etc channel indicator in the file name.
+    if not path.suffix == '.xcassets':
+        raise ValueError('Asset catalog filename must have .xcassets suffix')
+    name_parts = path.stem.split('_')
+    if len(name_parts) > 2:
+        raise ValueError('Asset catalog filename must have at most one _')
+    name_tag = f'_{name_parts[1]}' if len(name_parts) == 2 else ''
+    appicon_path = path.joinpath(os.pardir, f'AppIcon{name_tag}.icon')
+    return name_tag, appicon_path
+
+
+def _dispatch_outputs(output_files: list[str],
+                      name_tag: str) -> dict[str, pathlib.Path]:
+    """Maps the files output by `actool` to their final names.
+
+    Args:
+        output_files: The output files reported by `actool`.
+        name_tag: The channel tag of the asset catalog that was compiled.
+
+    Returns:
+        A dictionary mapping final file names to the `actool` outputs that
+        should be given those names.
+
+    Raises:
+        AssetCatalogException: If `actool` output an unexpected file.
+    """
+    if len(output_files) != 3:
+        raise AssetCatalogException(
+            'expected actool to output 3 files, but it instead output '
+            f'{len(output_files)} files, namely {output_files}')
+
+    # Exactly three output files are expected; handle them each appropriately.
+    outputs = {}
+    for output_file in output_files:
+        output_file = pathlib.Path(output_file)
+        if output_file.name == 'partial.plist':
+            # Ignore the partial plist, as the Chromium plist already has the
+            # required information.
+            pass
+        elif output_file.name == 'AppIcon.icns':
+            outputs[f'app{name_tag}.icns'] = output_file
+        elif output_file.name == 'Assets.car':
+            outputs[f'Assets{name_tag}.car'] = output_file
+        else:
+            raise AssetCatalogException(
+                f'Unexpected output file: {output_file}')
+    return outputs
+
+
+def _clone_package(source: pathlib.Path, destination: pathlib.Path) -> None:
+    """Copies the package at `source` to `destination`.
+
+    On APFS, `cp -c` clones the files rather than copying their contents, which
+    takes constant time. If cloning isn't possible (e.g. if the two paths are on
+    different volumes), fall back to a regular copy.
+    """
+    process = subprocess.run(['cp', '-c', '-R', source, destination],
+                             stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL)
+    if process.returncode != 0:
+        shutil.rmtree(destination, ignore_errors=True)
+        shutil.copytree(source, destination)
 
 
 def _process_path(path: pathlib.Path, min_deployment_target: str,
+                  actool_version: str, use_cache: bool,
                   verbose: bool) -> None:
     """Compiles a single `.xcassets` directory and `.icon` into a .car file.
 
@@ -96,75 +377,61 @@ def _process_path(path: pathlib.Path, min_deployment_target: str,
     and `Assets.car` files to the same directory as the input `.xcassets`
     directory, with names derived from the input path.
 
+    The outputs are cached, keyed on the contents of the inputs, the minimum
+    deployment target, the `actool` flags, and the version of `actool`. If the
+    cache already holds outputs for the inputs, they are used and `actool` is
+    not invoked at all.
+
     Args:
         path: A pathlib.Path object to the .xcassets directory to process.
         min_deployment_target: The minimum macOS deployment target string to
             pass to `actool`.
+        actool_version: The version of `actool`, used to key the cache.
+        use_cache: Whether previously cached outputs may be used.
 
     Raises:
         ValueError: If the asset catalog's path is incorrect in format.
         AssetCatalogException: If `actool` reported errors, or behaved in a way
             that was unexpected.
     """
+    name_tag, appicon_original_path = _prepare_inputs(path)
+    source_dir = path.joinpath(os.pardir)
+
+    icns_name = f'app{name_tag}.icns'
+    car_name = f'Assets{name_tag}.car'
+    cache_dir = _CACHE_DIR.joinpath(
+        _cache_key(path, appicon_original_path, min_deployment_target,
+                   actool_version))
+    cached_icns = cache_dir.joinpath(icns_name)
+    cached_car = cache_dir.joinpath(car_name)
+    if use_cache and cached_icns.is_file() and cached_car.is_file():
+        if verbose:
+            print(f'  Using cached outputs from: {cache_dir}')
+        _copy_output(cached_icns, source_dir.joinpath(icns_name), verbose)
+        _copy_output(cached_car, source_dir.joinpath(car_name), verbose)
+        return
+
     with tempfile.TemporaryDirectory() as tmp_dir:
         tmp_dir = pathlib.Path(tmp_dir)
         tmp_plist = tmp_dir.joinpath('partial.plist')
 
-        # The "tag" is the '_beta' etc channel indicator in the file name.
-        if not path.suffix == '.xcassets':
-            raise ValueError(
-                'Asset catalog filename must have .xcassets suffix')
-        name_parts = path.stem.split('_')
-        if len(name_parts) > 2:
-            raise ValueError('Asset catalog filename must have at most one _')
-        name_tag = f'_{name_parts[1]}' if len(name_parts) == 2 else ''
-        source_dir = path.joinpath(os.pardir)
-
         # The app icon is copied into the .car file under the name that it has
         # when given to actool, so make a copy in the temp directory to ensure
-        # it has the correct name. `shutil.copytree` is used as .icon "files"
-        # are really packages.
-        appicon_original_path = source_dir.joinpath(f'AppIcon{name_tag}.icon')
+        # it has the correct name. A recursive copy is needed as .icon "files"
+        # are really packages. A symlink is not used, as `actool` might resolve
+        # it and pick up the original name.
         appicon_tmp_path = tmp_dir.joinpath('AppIcon.icon')
-        shutil.copytree(appicon_original_path, appicon_tmp_path)
+        _clone_package(appicon_original_path, appicon_tmp_path)
 
         command = [
             # The binary.
             'xcrun',
             'actool',
 
-            # Output and error handling.
-            '--output-format=xml1',
-            '--notices',
-            '--warnings',
-            '--errors',
-
-            # Platform.
-            '--platform=macosx',
-            '--target-device=mac',
-
-            # Correctness. This command-line argument is undocumented. It forces
-            # `actool` aka `ibtool` to use bundled versions of the asset catalog
-            # frameworks so that it generates consistent results no matter what
-            # OS release it is run on. Xcode 26+ includes this when invoking
-            # `actool`; see various copies of the `AssetCatalogCompiler.xcspec`
-            # file found in various places inside the Xcode package.
-            '--lightweight-asset-runtime-mode=enabled',
-
-            # Correctness. This command-line argument is undocumented. By
-            # default, if an `.icon` file is provided to `actool`, then `actool`
-            # will ignore any corresponding fallback bitmaps in the provided
-            # `.xcassets` directory, and generate its own. However, `actool`
-            # only generates 1x fallback bitmaps, which causes blurry icons to
-            # appear on 2x screens on macOS releases prior to macOS 26, which is
-            # undesirable (FB19028379). Given that there already are hand-
-            # crafted icon bitmaps available in the `.xcassets` directory, stop
-            # `actool` from generating its own, and have it use the available
-            # ones instead.
-            '--enable-icon-stack-fallback-generation=disabled',
+            # Flags that are the same for every invocation.
+            *_ACTOOL_FLAGS,
 
             # Target information.
-            '--app-icon=AppIcon',
             f'--minimum-deployment-target={min_deployment_target}',
 
             # Where to place the outputs.
@@ -234,38 +501,36 @@ def _process_path(path: pathlib.Path, min_deployment_target: str,
         output_files = compilation_results.get('output-files')
         if output_files is None:
             raise AssetCatalogException('actool had no output files')
-        if len(output_files) != 3:
-            raise AssetCatalogException(
-                'expected actool to output 3 files, but it instead output '
-                f'{len(output_files)} files, namely {output_files}')
-
-        # Exactly three output files are expected; handle them each
-        # appropriately.
-        for output_file in output_files:
-            output_file = pathlib.Path(output_file)
-            if output_file.name == 'partial.plist':
-                # Ignore the partial plist, as the Chromium plist already has
-                # the required information.
-                pass
-            elif output_file.name == 'AppIcon.icns':
-                destination_path = source_dir.joinpath(f'app{name_tag}.icns')
-                if verbose:
-                    print(f'  Copying output to: {destination_path}')
-                shutil.copyfile(output_file, destination_path)
-                pass
-            elif output_file.name == 'Assets.car':
-                destination_path = source_dir.joinpath(f'Assets{name_tag}.car')
-                if verbose:
-                    print(f'  Copying output to: {destination_path}')
-                shutil.copyfile(output_file, destination_path)
-            else:
-                raise AssetCatalogException(
-                    f'Unexpected output file: {output_file}')
+        outputs = _dispatch_outputs(output_files, name_tag)
 
+        for name, output_file in outputs.items():
+            _copy_output(output_file, source_dir.joinpath(name), verbose)
 
-def main(args: list[str]):
-    _verify_actool_version()
+        # Only update the cache once actool is known to have succeeded. The
+        # cache is an optimization, so failing to fill it isn't fatal.
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            for name, output_file in outputs.items():
+                _store_in_cache(output_file, cache_dir.joinpath(name))
+        except OSError as e:
+            if verbose:
+                print(f'  Not caching outputs: {e}')
+
+
+def _process_path_buffered(path: pathlib.Path, **kwargs) -> str:
+    """Calls `_process_path`, capturing and returning its output.
+
+    Used when processing paths in parallel, so that the output for each path
+    can be printed in one piece rather than interleaved with that of others.
+    """
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        if kwargs['verbose']:
+            print(f'Processing: {path}')
+        _process_path(path, **kwargs)
+    return output.getvalue()
 
+
+def main(args: list[str]):
     parser = argparse.ArgumentParser()
     parser.add_argument(
         'paths',
@@ -278,17 +543,71 @@ def main(args: list[str]):
         dest='verbose',
         action='store_true',
         help='enable verbose output')
+    parser.add_argument(
+        '--no-cache',
+        dest='use_cache',
+        action='store_false',
+        help='always invoke actool, ignoring previously cached outputs')
+    parser.add_argument(
+        '--actool-version-verified',
+        dest='actool_version',
+        metavar='BUNDLE_VERSION',
+        help='the bundle-version (build number, not the short version) '
+        'reported by `xcrun actool --version`, already verified to be '
+        'suitably recent by the caller; skips the version check')
+    parser.add_argument(
+        '--min-deployment-target',
+        dest='min_deployment_target',
+        metavar='VERSION',
+        help='the minimum deployment target; skips reading it from '
+        'mac_sdk.gni')
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        dest='jobs',
+        type=int,
+        default=1,
+        help='the number of asset catalogs to compile in parallel')
     parsed = parser.parse_args(args)
 
-    min_deployment_target = _min_deployment_target()
+    actool_version = (parsed.actool_version or
+                      _verify_actool_version_cached())
+    min_deployment_target = (parsed.min_deployment_target or
+                             _min_deployment_target())
     if parsed.verbose:
         print('Determined the minimum deployment target to be '
               f'{min_deployment_target}.')
 
-    for path in parsed.paths:
-        if parsed.verbose:
-            print(f'Processing: {path}')
-        _process_path(pathlib.Path(path), min_deployment_target, parsed.verbose)
+    # `actool` merges every catalog that it is given into a single `.car` file,
+    # so each catalog needs its own invocation. Validate all of the paths before
+    # starting any of them, though, so that a bad path fails fast.
+    paths = [pathlib.Path(path) for path in parsed.paths]
+    for path in paths:
+        _prepare_inputs(path)
+
+    process_kwargs = dict(
+        min_deployment_target=min_deployment_target,
+        actool_version=actool_version,
+        use_cache=parsed.use_cache,
+        verbose=parsed.verbose)
+
+    jobs = min(parsed.jobs, len(paths), os.cpu_count() or 1)
+    if jobs <= 1:
+        for path in paths:
+            if parsed.verbose:
+                print(f'Processing: {path}')
+            _process_path(path, **process_kwargs)
+        return
+
+    if parsed.verbose:
+        print(f'Processing {len(paths)} paths with {jobs} jobs.')
+    # Exceptions raised in the workers propagate out of `map`. Each worker's
+    # output is printed as a whole, in the order of the paths.
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        for output in executor.map(
+                functools.partial(_process_path_buffered, **process_kwargs),
+                paths):
+            print(output, end='')
 
 
 if __name__ == '__main__':